@@ -4,20 +4,34 @@ Financial Transaction Data Producer for Kafka
 Generates realistic mock financial transaction data and streams it to Kafka.
 """
 
-import json
+import gc
+import io
+import os
 import time
 import uuid
 import random
 import argparse
 import signal
 import sys
+import threading
+from collections import deque
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
-from kafka import KafkaProducer
+import numpy as np
+from confluent_kafka import Producer
 from faker import Faker
 
+try:
+    import orjson
+except ImportError:  # serialize_value() falls back to the standard library encoder
+    orjson = None
+    import json
+
 fake = Faker()
+rng = np.random.default_rng()
 
 # Configuration
 TRANSACTION_TYPES = ['purchase', 'withdrawal', 'transfer', 'deposit', 'refund']
@@ -33,136 +47,552 @@ MERCHANT_CATEGORIES = [
 ]
 
 CARD_NETWORKS = ['Visa', 'Mastercard', 'Amex', 'Discover']
+CARD_TYPES = ['debit', 'credit']
+CHANNELS = ['mobile_app', 'web', 'pos_terminal', 'atm', 'branch']
+WITHDRAWAL_AMOUNTS = [20.0, 40.0, 50.0, 60.0, 80.0, 100.0, 200.0, 300.0, 500.0]
+VALUE_FORMATS = ['json', 'msgpack', 'avro']
+
+BURST_CHUNK_SIZE = 1000  # Transactions generated per generate_batch() call in burst mode
+TRANSACTION_POOL_SIZE = BURST_CHUNK_SIZE  # Reusable transaction dicts kept per generator
+PACING_WINDOW = 0.05  # Seconds of traffic sent between sleeps in continuous mode
+FAKER_TABLE_SIZE = 10_000  # Pre-generated cities, companies and IPs to sample from
+POLL_INTERVAL = 1000  # Messages produced per worker between delivery-report polls
+QUEUE_FULL_POLL_TIMEOUT = 0.01  # Seconds to poll for deliveries when the local queue is full
+CONNECT_TIMEOUT = 10.0  # Seconds to wait for broker metadata before giving up at startup
+STATS_INTERVAL = 1.0  # Seconds between progress reports
+
+
+class Merchant(dict):
+    """
+    Merchant data that is never modified once pooled.
+    
+    Its JSON encoding is cached on first serialization, so pooled merchants
+    are encoded once instead of once per transaction.
+    """
+    __slots__ = ('fragment',)
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fragment = None
+
+
+if orjson is not None:
+    def _orjson_default(obj):
+        # OPT_PASSTHROUGH_SUBCLASS routes Merchant here instead of encoding it as a dict
+        if isinstance(obj, Merchant):
+            if obj.fragment is None:
+                obj.fragment = orjson.Fragment(orjson.dumps(obj))
+            return obj.fragment
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def serialize_value(value: dict) -> bytes:
+        """Serialize a transaction to JSON bytes."""
+        return orjson.dumps(value, default=_orjson_default, option=orjson.OPT_PASSTHROUGH_SUBCLASS)
+else:
+    def serialize_value(value: dict) -> bytes:
+        """Serialize a transaction to JSON bytes."""
+        return json.dumps(value).encode('utf-8')
+
+
+def _format_uuid4(hex32: str) -> str:
+    """Format 32 random hex digits as a canonical (hyphenated) version 4 UUID string."""
+    variant = '89ab'[int(hex32[16], 16) & 0x3]
+    return f"{hex32[:8]}-{hex32[8:12]}-4{hex32[13:16]}-{variant}{hex32[17:20]}-{hex32[20:]}"
+
+
+def _enum(name: str, symbols: list) -> dict:
+    """Build an Avro enum schema."""
+    return {'type': 'enum', 'name': name, 'symbols': symbols}
+
+
+TRANSACTION_AVRO_SCHEMA = {
+    'type': 'record',
+    'name': 'FinancialTransaction',
+    'namespace': 'kafka_demo.financial_data',
+    'fields': [
+        {'name': 'transaction_id', 'type': {'type': 'string', 'logicalType': 'uuid'}},
+        {'name': 'timestamp', 'type': 'string'},
+        {'name': 'account_id', 'type': 'string'},
+        {'name': 'transaction_type', 'type': _enum('TransactionType', TRANSACTION_TYPES)},
+        {'name': 'amount', 'type': 'double'},
+        {'name': 'currency', 'type': _enum('Currency', CURRENCIES)},
+        {'name': 'status', 'type': _enum('Status', STATUSES)},
+        {'name': 'location', 'type': {
+            'type': 'record',
+            'name': 'Location',
+            'fields': [
+                {'name': 'city', 'type': 'string'},
+                {'name': 'country', 'type': 'string'},
+                {'name': 'latitude', 'type': 'double'},
+                {'name': 'longitude', 'type': 'double'}
+            ]
+        }},
+        {'name': 'merchant', 'type': ['null', {
+            'type': 'record',
+            'name': 'Merchant',
+            'fields': [
+                {'name': 'merchant_id', 'type': 'string'},
+                {'name': 'merchant_name', 'type': 'string'},
+                {'name': 'merchant_category', 'type': 'string'},
+                {'name': 'mcc_code', 'type': 'string'}
+            ]
+        }], 'default': None},
+        {'name': 'card_info', 'type': ['null', {
+            'type': 'record',
+            'name': 'CardInfo',
+            'fields': [
+                {'name': 'card_last_four', 'type': 'string'},
+                {'name': 'card_network', 'type': _enum('CardNetwork', CARD_NETWORKS)},
+                {'name': 'card_type', 'type': _enum('CardType', CARD_TYPES)}
+            ]
+        }], 'default': None},
+        {'name': 'metadata', 'type': {
+            'type': 'record',
+            'name': 'Metadata',
+            'fields': [
+                {'name': 'channel', 'type': _enum('Channel', CHANNELS)},
+                {'name': 'device_id', 'type': ['null', 'string'], 'default': None},
+                {'name': 'ip_address', 'type': ['null', 'string'], 'default': None}
+            ]
+        }},
+        {'name': 'recipient_account_id', 'type': ['null', 'string'], 'default': None},
+        {'name': 'transfer_reference', 'type': ['null', 'string'], 'default': None}
+    ]
+}
+
+
+def get_value_serializer(value_format: str):
+    """
+    Return the Kafka value serializer for the given format.
+    
+    msgpack and Avro (schemaless, TRANSACTION_AVRO_SCHEMA) produce smaller
+    messages than JSON; their packages are only imported when selected.
+    Their serializers keep one packer or output buffer per worker thread and
+    reuse it for every message.
+    """
+    if value_format == 'json':
+        return serialize_value
+    
+    local = threading.local()
+    if value_format == 'msgpack':
+        import msgpack
+        
+        def serialize_msgpack(value: dict) -> bytes:
+            packer = getattr(local, 'packer', None)
+            if packer is None:
+                # Unlike msgpack.packb, a Packer keeps its internal buffer between calls
+                packer = local.packer = msgpack.Packer()
+            return packer.pack(value)
+        
+        return serialize_msgpack
+    if value_format == 'avro':
+        import fastavro
+        parsed_schema = fastavro.parse_schema(TRANSACTION_AVRO_SCHEMA)
+        
+        def serialize_avro(value: dict) -> bytes:
+            buffer = getattr(local, 'buffer', None)
+            if buffer is None:
+                buffer = local.buffer = io.BytesIO()
+            buffer.seek(0)
+            buffer.truncate()
+            fastavro.schemaless_writer(buffer, parsed_schema, value)
+            return buffer.getvalue()
+        
+        return serialize_avro
+    raise ValueError(f"Unknown value format: {value_format}")
+
+
+# (epoch second, 'YYYY-MM-DDTHH:MM:SS') of the last formatted timestamp; swapped as one tuple
+_iso_second = (0, '')
+
+
+def _utc_timestamp() -> str:
+    """Return the current UTC time in ISO 8601 with microseconds, e.g. 2024-01-29T12:00:00.000000Z."""
+    global _iso_second
+    ns = time.time_ns()
+    second, prefix = _iso_second
+    if ns // 1_000_000_000 != second:
+        # Only format the date and time once per second
+        second = ns // 1_000_000_000
+        prefix = datetime.fromtimestamp(second, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+        _iso_second = (second, prefix)
+    return f"{prefix}.{(ns // 1000) % 1_000_000:06d}Z"
+
+
+@lru_cache(maxsize=None)
+def _faker_lookup_tables() -> tuple:
+    """
+    Pre-generate Faker values once per process.
+    
+    Faker providers are far too slow to call per transaction, so generators
+    pick from these tables instead. They are read-only and shared by all
+    worker threads.
+    """
+    cities = [fake.city() for _ in range(FAKER_TABLE_SIZE)]
+    companies = [fake.company() for _ in range(FAKER_TABLE_SIZE)]
+    ips = [fake.ipv4() for _ in range(FAKER_TABLE_SIZE)]
+    countries = sorted({fake.country_code() for _ in range(2_000)})
+    return cities, companies, ips, countries
+
+
+def _split(total: int, parts: int) -> list:
+    """Split total into parts near-equal shares."""
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
 
 
 class FinancialDataGenerator:
     """Generates realistic financial transaction data."""
     
     def __init__(self):
-        self.fake = Faker()
-        # Pre-generate some account IDs to simulate repeat customers
-        self.account_pool = [self._generate_account_id() for _ in range(100)]
-        self.merchant_pool = [self._generate_merchant() for _ in range(50)]
+        self._cities, self._companies, self._ips, self._countries = _faker_lookup_tables()
+        # Pre-generate some accounts to simulate repeat customers
+        # (bounded deques, so the oldest entry is evicted in O(1) once full)
+        self.account_pool = deque((self._generate_account() for _ in range(100)), maxlen=200)
+        self.merchant_pool = deque((self._generate_merchant() for _ in range(50)), maxlen=100)
+        # Recycled transaction dicts, see release_transaction()
+        self._transaction_pool = [self._new_transaction() for _ in range(TRANSACTION_POOL_SIZE)]
+    
+    @staticmethod
+    def _new_transaction() -> dict:
+        """
+        Allocate an empty transaction dict with every key pre-populated.
+        
+        Optional keys (merchant, card_info, device_id, ip_address) are
+        removed rather than set to None when a transaction has no value for
+        them, so the payload never carries null fields.
+        """
+        return {
+            'transaction_id': None,
+            'timestamp': None,
+            'account_id': None,
+            'transaction_type': None,
+            'amount': None,
+            'currency': None,
+            'status': None,
+            'location': {'city': None, 'country': None, 'latitude': None, 'longitude': None},
+            'merchant': None,
+            'card_info': None,
+            'metadata': {'channel': None, 'device_id': None, 'ip_address': None}
+        }
+    
+    def _acquire_transaction(self, transaction_type: str) -> dict:
+        """Take a transaction dict from the pool, or allocate one if it is empty."""
+        transaction = self._transaction_pool.pop() if self._transaction_pool else self._new_transaction()
+        if transaction_type != 'transfer':
+            transaction.pop('recipient_account_id', None)
+            transaction.pop('transfer_reference', None)
+        return transaction
+    
+    def release_transaction(self, transaction: dict) -> None:
+        """
+        Return a transaction to the pool once it has been serialized.
+        
+        The dict (and its location, card_info and metadata sub-dicts) will be
+        overwritten by a later generate_transaction() or generate_batch() call.
+        """
+        if len(self._transaction_pool) < TRANSACTION_POOL_SIZE:
+            self._transaction_pool.append(transaction)
     
     def _generate_account_id(self) -> str:
         """Generate a realistic account ID."""
         return f"ACC-{random.randint(100000, 999999)}-{random.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}"
     
-    def _generate_merchant(self) -> dict:
+    def _generate_account(self) -> tuple:
+        """Generate an (account ID, Kafka key bytes) pair, encoding the key once."""
+        account_id = self._generate_account_id()
+        return account_id, account_id.encode('ascii')
+    
+    def _generate_merchant(self) -> Merchant:
         """Generate merchant data."""
         category = random.choice(MERCHANT_CATEGORIES)
-        return {
+        return Merchant({
             'merchant_id': f"MER-{uuid.uuid4().hex[:8].upper()}",
-            'merchant_name': self.fake.company(),
+            'merchant_name': random.choice(self._companies),
             'merchant_category': category,
             'mcc_code': str(random.randint(1000, 9999))
-        }
+        })
     
-    def generate_transaction(self) -> dict:
-        """Generate a single financial transaction."""
-        transaction_type = random.choice(TRANSACTION_TYPES)
-        currency = random.choice(CURRENCIES)
-        
-        # Amount varies by transaction type
-        if transaction_type == 'purchase':
-            amount = round(random.uniform(1.00, 500.00), 2)
-        elif transaction_type == 'withdrawal':
-            amount = round(random.choice([20, 40, 50, 60, 80, 100, 200, 300, 500]), 2)
-        elif transaction_type == 'transfer':
-            amount = round(random.uniform(10.00, 5000.00), 2)
-        elif transaction_type == 'deposit':
-            amount = round(random.uniform(100.00, 10000.00), 2)
-        else:  # refund
-            amount = round(random.uniform(5.00, 200.00), 2)
+    def _pick_account(self, reuse: bool) -> tuple:
+        """Return an (account ID, key bytes) pair from the pool, or add a new one to it."""
+        if reuse:
+            return self.account_pool[random.randrange(len(self.account_pool))]
+        account = self._generate_account()
+        self.account_pool.append(account)
+        return account
+    
+    def _pick_merchant(self, reuse: bool) -> Merchant:
+        """Return a merchant from the pool, or add a new one to it."""
+        if reuse:
+            return self.merchant_pool[random.randrange(len(self.merchant_pool))]
+        merchant = self._generate_merchant()
+        self.merchant_pool.append(merchant)
+        return merchant
+    
+    def _fill_location(self, location: dict) -> None:
+        """Generate location data into an existing dict."""
+        location['city'] = random.choice(self._cities)
+        location['country'] = random.choice(self._countries)
+        location['latitude'] = round(random.uniform(-90.0, 90.0), 6)
+        location['longitude'] = round(random.uniform(-180.0, 180.0), 6)
+    
+    def _fill_transaction(
+        self,
+        transaction_type: str,
+        transaction_id: str,
+        amount: float,
+        currency: str,
+        status: str,
+        reuse_account: bool,
+        reuse_merchant: bool,
+        card_last_four: str,
+        card_network: str,
+        card_type: str,
+        channel: str,
+        device_id: Optional[str],
+        ip_address: Optional[str],
+        transfer_reference: Optional[str],
+        _timestamp=_utc_timestamp
+    ) -> tuple:
+        """
+        Assemble a pooled transaction from pre-drawn random values.
         
-        # Use existing account or generate new one (80% existing, 20% new)
-        if random.random() < 0.8:
-            account_id = random.choice(self.account_pool)
-        else:
-            account_id = self._generate_account_id()
-            self.account_pool.append(account_id)
-            if len(self.account_pool) > 200:
-                self.account_pool.pop(0)
+        Shared by generate_transaction() and generate_batch() so both emit
+        identical payloads. Values that do not apply to the transaction type
+        are ignored; optional fields left as None are omitted. Called once per
+        message, so callers pass every value positionally.
+        """
+        transaction = self._acquire_transaction(transaction_type)
+        transaction['transaction_id'] = transaction_id
+        transaction['timestamp'] = _timestamp()
+        # Use existing account or generate new one
+        transaction['account_id'], key = self._pick_account(reuse_account)
+        transaction['transaction_type'] = transaction_type
+        transaction['amount'] = amount
+        transaction['currency'] = currency
+        transaction['status'] = status
         
         # Generate location
-        location = {
-            'city': self.fake.city(),
-            'country': self.fake.country_code(),
-            'latitude': float(self.fake.latitude()),
-            'longitude': float(self.fake.longitude())
-        }
+        self._fill_location(transaction['location'])
         
         # Use existing merchant or generate new one
         if transaction_type in ['purchase', 'refund']:
-            if random.random() < 0.7:
-                merchant = random.choice(self.merchant_pool)
-            else:
-                merchant = self._generate_merchant()
-                self.merchant_pool.append(merchant)
-                if len(self.merchant_pool) > 100:
-                    self.merchant_pool.pop(0)
+            transaction['merchant'] = self._pick_merchant(reuse_merchant)
         else:
-            merchant = None
+            transaction.pop('merchant', None)
         
         # Card info (only for card-based transactions)
-        card_info = None
         if transaction_type in ['purchase', 'withdrawal', 'refund']:
-            card_info = {
-                'card_last_four': str(random.randint(1000, 9999)),
-                'card_network': random.choice(CARD_NETWORKS),
-                'card_type': random.choice(['debit', 'credit'])
-            }
+            card_info = transaction.get('card_info') or {}
+            card_info['card_last_four'] = card_last_four
+            card_info['card_network'] = card_network
+            card_info['card_type'] = card_type
+            transaction['card_info'] = card_info
+        else:
+            transaction.pop('card_info', None)
         
-        transaction = {
-            'transaction_id': str(uuid.uuid4()),
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'account_id': account_id,
-            'transaction_type': transaction_type,
-            'amount': amount,
-            'currency': currency,
-            'status': random.choices(STATUSES, weights=STATUS_WEIGHTS)[0],
-            'location': location,
-            'merchant': merchant,
-            'card_info': card_info,
-            'metadata': {
-                'channel': random.choice(['mobile_app', 'web', 'pos_terminal', 'atm', 'branch']),
-                'device_id': uuid.uuid4().hex[:16] if random.random() > 0.3 else None,
-                'ip_address': self.fake.ipv4() if random.random() > 0.4 else None
-            }
-        }
+        metadata = transaction['metadata']
+        metadata['channel'] = channel
+        if device_id is not None:
+            metadata['device_id'] = device_id
+        else:
+            metadata.pop('device_id', None)
+        if ip_address is not None:
+            metadata['ip_address'] = ip_address
+        else:
+            metadata.pop('ip_address', None)
         
         # Add transfer-specific fields
         if transaction_type == 'transfer':
             transaction['recipient_account_id'] = self._generate_account_id()
-            transaction['transfer_reference'] = f"TRF-{uuid.uuid4().hex[:10].upper()}"
+            transaction['transfer_reference'] = transfer_reference
         
-        return transaction
+        return transaction, key
+    
+    def generate_transaction(
+        self,
+        # Hot globals bound as defaults so lookups are local (LOAD_FAST)
+        _choice=random.choice,
+        _choices=random.choices,
+        _uniform=random.uniform,
+        _random=random.random,
+        _randint=random.randint,
+        _uuid4=uuid.uuid4,
+        _types=TRANSACTION_TYPES,
+        _currencies=CURRENCIES,
+    ) -> tuple:
+        """Generate a single financial transaction as a (transaction, key bytes) pair."""
+        transaction_type = _choice(_types)
+        
+        # Amount varies by transaction type
+        if transaction_type == 'purchase':
+            amount = round(_uniform(1.00, 500.00), 2)
+        elif transaction_type == 'withdrawal':
+            amount = _choice(WITHDRAWAL_AMOUNTS)
+        elif transaction_type == 'transfer':
+            amount = round(_uniform(10.00, 5000.00), 2)
+        elif transaction_type == 'deposit':
+            amount = round(_uniform(100.00, 10000.00), 2)
+        else:  # refund
+            amount = round(_uniform(5.00, 200.00), 2)
+        
+        return self._fill_transaction(
+            transaction_type,
+            str(_uuid4()),  # transaction_id
+            amount,
+            _choice(_currencies),
+            _choices(STATUSES, weights=STATUS_WEIGHTS)[0],  # status
+            # 80% existing accounts, 70% existing merchants
+            _random() < 0.8,
+            _random() < 0.7,
+            str(_randint(1000, 9999)),  # card_last_four
+            _choice(CARD_NETWORKS),
+            _choice(CARD_TYPES),
+            _choice(CHANNELS),
+            _uuid4().hex[:16] if _random() > 0.3 else None,  # device_id
+            _choice(self._ips) if _random() > 0.4 else None,  # ip_address
+            f"TRF-{_uuid4().hex[:10].upper()}" if transaction_type == 'transfer' else None
+        )
+    
+    def generate_batch(self, n: int) -> list:
+        """
+        Generate n financial transactions as (transaction, key bytes) pairs.
+        
+        All per-transaction random draws are made up front with vectorized
+        NumPy calls; the loop below only assembles the dicts.
+        """
+        types = rng.choice(TRANSACTION_TYPES, size=n)
+        currencies = rng.choice(CURRENCIES, size=n).tolist()
+        statuses = rng.choice(STATUSES, size=n, p=STATUS_WEIGHTS).tolist()
+        channels = rng.choice(CHANNELS, size=n).tolist()
+        card_last_four = rng.integers(1000, 10000, size=n).astype(str).tolist()
+        card_networks = rng.choice(CARD_NETWORKS, size=n).tolist()
+        card_types = rng.choice(CARD_TYPES, size=n).tolist()
+        
+        # Amount varies by transaction type
+        amounts = np.select(
+            [types == 'purchase', types == 'withdrawal', types == 'transfer', types == 'deposit'],
+            [
+                rng.uniform(1.00, 500.00, size=n),
+                rng.choice(WITHDRAWAL_AMOUNTS, size=n),
+                rng.uniform(10.00, 5000.00, size=n),
+                rng.uniform(100.00, 10000.00, size=n),
+            ],
+            default=rng.uniform(5.00, 200.00, size=n)  # refund
+        )
+        amounts = np.round(amounts, 2).tolist()
+        
+        reuse_account = (rng.random(n) < 0.8).tolist()
+        reuse_merchant = (rng.random(n) < 0.7).tolist()
+        has_device = (rng.random(n) > 0.3).tolist()
+        has_ip = (rng.random(n) > 0.4).tolist()
+        
+        # One urandom read per batch for all IDs: 16 bytes per transaction ID,
+        # 8 per device ID and 5 per transfer reference
+        raw = os.urandom(29 * n).hex()
+        
+        transactions = []
+        for i, transaction_type in enumerate(types.tolist()):
+            offset = 58 * i
+            transactions.append(self._fill_transaction(
+                transaction_type,
+                _format_uuid4(raw[offset:offset + 32]),
+                amounts[i],
+                currencies[i],
+                statuses[i],
+                reuse_account[i],
+                reuse_merchant[i],
+                card_last_four[i],
+                card_networks[i],
+                card_types[i],
+                channels[i],
+                raw[offset + 32:offset + 48] if has_device[i] else None,
+                random.choice(self._ips) if has_ip[i] else None,
+                f"TRF-{raw[offset + 48:offset + 58].upper()}" if transaction_type == 'transfer' else None
+            ))
+        
+        return transactions
 
 
 class KafkaTransactionProducer:
     """Produces financial transactions to Kafka."""
     
-    def __init__(self, bootstrap_servers: str, topic: str):
+    def __init__(self, bootstrap_servers: str, topic: str, acks: str = '1', workers: int = 1,
+                 value_format: str = 'json'):
         self.topic = topic
-        self.generator = FinancialDataGenerator()
+        self.workers = workers
+        # One generator per worker thread so they never contend on the pools
+        self.generators = [FinancialDataGenerator() for _ in range(workers)]
         self.running = False
-        self.message_count = 0
+        # Set alongside running = False so pacing workers wake up instead of sleeping out their interval
+        self._stop_event = threading.Event()
+        # Per-worker send counts; each slot is only ever written by its own worker
+        self._sent_counts = [0] * workers
+        # Delivery callbacks run on whichever thread polls, so failures are tallied under a lock
+        self._failure_lock = threading.Lock()
+        self._delivery_failures = 0
+        self._last_delivery_error = None
+        
+        self.serialize = get_value_serializer(value_format)
         
         print(f"Connecting to Kafka at {bootstrap_servers}...")
-        self.producer = KafkaProducer(
-            bootstrap_servers=bootstrap_servers,
-            value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-            key_serializer=lambda k: k.encode('utf-8') if k else None,
-            acks='all',
-            retries=3
-        )
+        # librdkafka batches, compresses and writes to the brokers on its own
+        # threads, outside the GIL
+        self.producer = Producer({
+            'bootstrap.servers': bootstrap_servers,
+            'acks': acks,
+            'retries': 3,
+            # Coalesce many small messages into large compressed batches
+            'linger.ms': 100,
+            'batch.num.messages': 10_000,
+            'batch.size': 1_000_000,
+            'compression.type': 'lz4',
+            'max.in.flight.requests.per.connection': 5,
+            # Large local queue to absorb bursts
+            'queue.buffering.max.messages': 1_000_000,
+            'queue.buffering.max.kbytes': 1_048_576
+        })
+        # librdkafka connects lazily; fetch metadata so an unreachable cluster
+        # fails here (KafkaException) instead of after queueing every message
+        self.producer.list_topics(timeout=CONNECT_TIMEOUT)
         print("Connected to Kafka successfully!")
     
-    def send_transaction(self, transaction: dict) -> None:
-        """Send a single transaction to Kafka."""
-        key = transaction['account_id']
-        self.producer.send(self.topic, key=key, value=transaction)
-        self.message_count += 1
+    @property
+    def message_count(self) -> int:
+        """Total number of transactions sent by all workers."""
+        return sum(self._sent_counts)
+    
+    def send_transaction(self, transaction: dict, key: bytes, worker: int = 0) -> None:
+        """
+        Send a single transaction to Kafka, keyed by its pre-encoded account ID.
+        
+        The transaction is handed back to the pool of the given worker's
+        generator afterwards, so callers must not hold on to it.
+        """
+        payload = self.serialize(transaction)
+        self.generators[worker].release_transaction(transaction)
+        while True:
+            try:
+                self.producer.produce(self.topic, key=key, value=payload, on_delivery=self._on_delivery)
+                break
+            except BufferError:
+                # Local queue is full: serve delivery reports until librdkafka frees room
+                self.producer.poll(QUEUE_FULL_POLL_TIMEOUT)
+        self._sent_counts[worker] += 1
+        if self._sent_counts[worker] % POLL_INTERVAL == 0:
+            self.producer.poll(0)
+    
+    def _on_delivery(self, err, msg) -> None:
+        """Count failed deliveries; successful ones need no handling."""
+        if err is not None:
+            with self._failure_lock:
+                self._delivery_failures += 1
+                self._last_delivery_error = err
+    
+    def _report_failures(self) -> None:
+        """Print a summary of failed deliveries, if there were any."""
+        if self._delivery_failures:
+            print(f"{self._delivery_failures} transactions failed to deliver "
+                  f"(last error: {self._last_delivery_error})", file=sys.stderr)
     
     def run(self, rate: float = 1.0, max_messages: Optional[int] = None) -> None:
         """
@@ -173,51 +603,137 @@ class KafkaTransactionProducer:
             max_messages: Maximum number of messages to send (None for unlimited)
         """
         self.running = True
-        interval = 1.0 / rate
+        self._stop_event.clear()
+        quotas = _split(max_messages, self.workers) if max_messages is not None else [None] * self.workers
+        # Workers with a zero share have nothing to send, so they are not started
+        active = [worker for worker in range(self.workers) if quotas[worker] != 0]
         
         print(f"Starting to produce transactions at {rate} TPS to topic '{self.topic}'")
         print("Press Ctrl+C to stop...")
         
+        stats_done = self._start_stats()
         try:
-            while self.running:
-                if max_messages and self.message_count >= max_messages:
-                    print(f"\nReached maximum message count: {max_messages}")
-                    break
-                
-                transaction = self.generator.generate_transaction()
-                self.send_transaction(transaction)
-                
-                if self.message_count % 10 == 0:
-                    print(f"\rProduced {self.message_count} transactions...", end='', flush=True)
-                
-                time.sleep(interval)
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(self._run_worker, worker, rate / len(active), quotas[worker])
+                    for worker in active
+                ]
+                try:
+                    for future in wait(futures, return_when=FIRST_EXCEPTION).done:
+                        future.result()
+                finally:
+                    self.request_stop()
+                    stats_done.set()
+            
+            if max_messages is not None and self.message_count >= max_messages:
+                print(f"\nReached maximum message count: {max_messages}")
                 
         except KeyboardInterrupt:
             print("\n\nShutting down gracefully...")
         finally:
             self.stop()
     
+    def _run_worker(self, worker: int, rate: float, max_messages: Optional[int]) -> None:
+        """Produce transactions from one worker thread at the given rate."""
+        generator = self.generators[worker]
+        interval = 1.0 / rate
+        # Send in micro-batches with one sleep per PACING_WINDOW rather than one
+        # per message, so high rates are not capped by sleep granularity
+        batch = max(1, int(rate * PACING_WINDOW))
+        
+        deadline = time.monotonic()
+        while self.running:
+            if max_messages is not None and self._sent_counts[worker] >= max_messages:
+                break
+            
+            deadline += interval * batch
+            for _ in range(batch):
+                if max_messages is not None and self._sent_counts[worker] >= max_messages:
+                    break
+                
+                transaction, key = generator.generate_transaction()
+                self.send_transaction(transaction, key, worker)
+            
+            self.producer.poll(0)
+            slack = deadline - time.monotonic()
+            if slack > 0:
+                self._stop_event.wait(slack)
+    
     def run_burst(self, count: int) -> None:
-        """Send a burst of transactions as fast as possible."""
+        """Send a burst of transactions as fast as possible, until done or stopped."""
+        self.running = True
         print(f"Sending burst of {count} transactions...")
         
-        for i in range(count):
-            transaction = self.generator.generate_transaction()
-            self.send_transaction(transaction)
-            
-            if (i + 1) % 100 == 0:
-                print(f"\rSent {i + 1}/{count} transactions...", end='', flush=True)
+        # Transaction dicts are pooled, so the cyclic GC has little to reclaim here
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        stats_done = self._start_stats(total=count)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(self._burst_worker, worker, subcount)
+                    for worker, subcount in enumerate(_split(count, self.workers))
+                ]
+                try:
+                    # Return as soon as one worker fails, so the others can be stopped
+                    for future in wait(futures, return_when=FIRST_EXCEPTION).done:
+                        future.result()
+                finally:
+                    self.request_stop()
+                    stats_done.set()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
         
+        # Flush once, after every worker has stopped producing
         self.producer.flush()
-        print(f"\nBurst complete! Sent {count} transactions.")
+        if self.message_count < count:
+            print(f"\nBurst stopped early. Sent {self.message_count}/{count} transactions.")
+        else:
+            print(f"\nBurst complete! Sent {count} transactions.")
+        self._report_failures()
+    
+    def _burst_worker(self, worker: int, count: int) -> None:
+        """Send count transactions from one worker thread as fast as possible."""
+        generator = self.generators[worker]
+        sent = 0
+        while sent < count and self.running:
+            batch = generator.generate_batch(min(BURST_CHUNK_SIZE, count - sent))
+            for transaction, key in batch:
+                if not self.running:
+                    return
+                self.send_transaction(transaction, key, worker)
+            sent += len(batch)
+    
+    def _start_stats(self, total: Optional[int] = None) -> threading.Event:
+        """Report progress from a daemon thread until the returned event is set."""
+        done = threading.Event()
+        threading.Thread(target=self._stats_loop, args=(done, total), daemon=True).start()
+        return done
+    
+    def _stats_loop(self, done: threading.Event, total: Optional[int]) -> None:
+        """Print the message count and send rate every STATS_INTERVAL seconds."""
+        previous = self.message_count
+        while not done.wait(STATS_INTERVAL):
+            count = self.message_count
+            progress = f"{count}/{total}" if total else str(count)
+            rate = (count - previous) / STATS_INTERVAL
+            failed = f", {self._delivery_failures} failed" if self._delivery_failures else ''
+            print(f"\rProduced {progress} transactions ({rate:.0f} msg/s{failed})...", end='', flush=True)
+            previous = count
+    
+    def request_stop(self) -> None:
+        """Ask the workers to stop; safe to call from a signal handler."""
+        self.running = False
+        self._stop_event.set()
     
     def stop(self) -> None:
         """Stop the producer and flush remaining messages."""
-        self.running = False
+        self.request_stop()
         print(f"Flushing remaining messages...")
         self.producer.flush()
-        self.producer.close()
         print(f"Producer stopped. Total messages sent: {self.message_count}")
+        self._report_failures()
 
 
 def main():
@@ -252,18 +768,45 @@ def main():
         default=None,
         help='Send a burst of N transactions and exit'
     )
+    parser.add_argument(
+        '--acks',
+        choices=['0', '1', 'all'],
+        default='1',
+        help='Broker acknowledgements required per batch: 0, 1 or all (default: 1)'
+    )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help='Worker threads generating and sending transactions (default: 1)'
+    )
+    parser.add_argument(
+        '--format', '-f',
+        choices=VALUE_FORMATS,
+        default='json',
+        help='Message value encoding (default: json). msgpack and avro are smaller, '
+             'but the connector as registered only reads JSON'
+    )
     
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
     
     producer = KafkaTransactionProducer(
         bootstrap_servers=args.bootstrap_servers,
-        topic=args.topic
+        topic=args.topic,
+        acks=args.acks,
+        workers=args.workers,
+        value_format=args.format
     )
     
-    # Handle graceful shutdown
+    # Handle graceful shutdown: the workers notice, and run()/run_burst() flush once they have stopped
     def signal_handler(sig, frame):
-        producer.stop()
-        sys.exit(0)
+        print("\n\nShutting down gracefully... (press Ctrl+C again to exit without flushing)")
+        # A second signal terminates the process, e.g. if flush() hangs on an unreachable broker
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        producer.request_stop()
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)